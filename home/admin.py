@@ -1,3 +1,8 @@
 from django.contrib import admin
 
 # Register your models here.
+from .models import Room, Bed, Allocation
+
+admin.site.register(Room)
+admin.site.register(Bed)
+admin.site.register(Allocation)
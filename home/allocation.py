@@ -0,0 +1,75 @@
+"""
+Bed allocation.
+
+A bed is free for [start, end) when none of its allocations overlap that
+range. Overlapping allocations are found through the end_date index, which
+only reaches stays that end after ``start`` (or have no end yet), so lookups
+cost the same whether a bed has a month or ten years of history behind it.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import Allocation, Bed, Student
+
+
+class AllocationError(Exception):
+    pass
+
+
+def overlapping(allocations, start, end=None):
+    """Allocations that overlap [start, end); end=None means open-ended"""
+    allocations = allocations.filter(Q(end_date__isnull=True) | Q(end_date__gt=start))
+    if end is not None:
+        allocations = allocations.filter(start_date__lt=end)
+    return allocations
+
+
+def _taken_bed_ids(start, end):
+    return overlapping(Allocation.objects.all(), start, end).values("bed_id")
+
+
+def free_beds(start, end=None, floor=None, sharing=None):
+    """Beds with no allocation overlapping [start, end)"""
+    beds = Bed.objects.select_related("room")
+    if floor is not None:
+        beds = beds.filter(room__floor=floor)
+    if sharing:
+        beds = beds.filter(room__sharing=sharing)
+    return beds.exclude(id__in=_taken_bed_ids(start, end)).order_by("room__floor", "room__number", "label")
+
+
+def occupancy(day):
+    """Total and free beds per sharing type on `day`"""
+    taken = _taken_bed_ids(day, day + timedelta(days=1))
+    return (
+        Bed.objects.values("room__sharing")
+        .annotate(total=Count("id"), free=Count("id", filter=~Q(id__in=taken)))
+        .order_by("room__sharing")
+    )
+
+
+def allocate_bed(student, bed_id, start, end=None):
+    """Gives `student` bed `bed_id` for [start, end), or raises AllocationError.
+
+    The student and bed rows are locked (SELECT ... FOR UPDATE, always student
+    first, then bed) for the duration of the check-and-insert. Concurrent
+    bookings of the same bed, or by the same student, serialise and the second
+    one sees the first one's allocation. SQLite has no row locks; there the
+    IMMEDIATE transaction mode in settings gives the same guarantee by
+    serialising write transactions.
+    """
+    if end is not None and end <= start:
+        raise AllocationError("Check-out date must be after check-in date.")
+
+    with transaction.atomic():
+        student = Student.objects.select_for_update().get(pk=student.pk)
+        bed = Bed.objects.select_for_update().filter(id=bed_id).first()
+        if bed is None:
+            raise AllocationError("That bed does not exist.")
+        if overlapping(bed.allocations.all(), start, end).exists():
+            raise AllocationError(f"Bed {bed} is already booked for those dates.")
+        if overlapping(student.allocations.all(), start, end).exists():
+            raise AllocationError("You already have a bed for those dates.")
+        return Allocation.objects.create(bed=bed, student=student, start_date=start, end_date=end)
@@ -0,0 +1,59 @@
+"""
+Payment archival.
+
+Closed academic years are moved from ``Payment`` into ``ArchivedPayment`` so the
+table the payment pages read and write stays limited to the current year.
+"""
+from django.db import transaction
+
+from .models import (
+    ArchivedPayment, Payment, academic_year_bounds, academic_year_for, current_academic_year,
+)
+
+ARCHIVE_BATCH_SIZE = 1000
+
+
+def archivable_years():
+    """Closed academic years that still have rows in the Payment table"""
+    first_open_day, _ = academic_year_bounds(current_academic_year())
+    oldest = (
+        Payment.objects.filter(date_paid__lt=first_open_day)
+        .order_by("date_paid").values_list("date_paid", flat=True).first()
+    )
+    if oldest is None:
+        return []
+    return list(range(academic_year_for(oldest), current_academic_year()))
+
+
+def archive_academic_year(year, batch_size=ARCHIVE_BATCH_SIZE):
+    """Moves every payment of academic year `year` into the archive table.
+
+    Each batch is copied and deleted in its own transaction, so writers on the
+    Payment table are only held up for one batch at a time. Returns the number
+    of payments archived.
+    """
+    if year >= current_academic_year():
+        raise ValueError(f"Academic year {year}-{year + 1} is still open.")
+
+    start, end = academic_year_bounds(year)
+    year_payments = Payment.objects.filter(date_paid__gte=start, date_paid__lt=end)
+    moved = 0
+    while True:
+        with transaction.atomic():
+            batch = list(year_payments.order_by("id")[:batch_size])
+            if not batch:
+                break
+            ArchivedPayment.objects.bulk_create([
+                ArchivedPayment(
+                    student_id=p.student_id,
+                    amount=p.amount,
+                    month=p.month,
+                    date_paid=p.date_paid,
+                    academic_year=year,
+                    original_id=p.id,
+                )
+                for p in batch
+            ])
+            Payment.objects.filter(id__in=[p.id for p in batch]).delete()
+        moved += len(batch)
+    return moved
@@ -0,0 +1,66 @@
+"""
+Payment audit trail.
+
+Views make payment changes inside ``with audited(request):`` and call
+``record_payment_change`` for each one; entries are only buffered on the
+request. When the block ends the buffer is written with one ``bulk_create``
+in the same transaction as the payment writes, so a money change is never
+committed without its trail. Requests that change nothing pay nothing.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import PaymentAuditLog
+
+_BUFFER_ATTR = "_payment_audit_buffer"
+
+
+def payment_snapshot(payment):
+    """JSON-safe copy of the audited payment fields"""
+    # Freshly assigned values are still raw (a POSTed string, the timezone.now
+    # default), so normalise them to what the database stores
+    date_paid = payment.date_paid
+    if isinstance(date_paid, datetime):
+        date_paid = date_paid.date()
+    return {
+        "month": payment.month,
+        "amount": f"{Decimal(str(payment.amount)):.2f}",
+        "date_paid": date_paid.isoformat(),
+    }
+
+
+def record_payment_change(request, action, payment, before=None):
+    """Buffers an audit entry; `before` is a payment_snapshot taken before the change"""
+    buffer = getattr(request, _BUFFER_ATTR, None)
+    if buffer is None:
+        buffer = []
+        setattr(request, _BUFFER_ATTR, buffer)
+    buffer.append(PaymentAuditLog(
+        payment_id=payment.id,
+        student_id=payment.student_id,
+        action=action,
+        before=before,
+        after=None if action == "delete" else payment_snapshot(payment),
+        admin_id=request.session.get("admin_id"),
+        created_at=timezone.now(),
+    ))
+
+
+def flush_payment_audit(request):
+    """Writes and clears the request's buffered entries with one bulk_create"""
+    buffer = getattr(request, _BUFFER_ATTR, None)
+    if buffer:
+        PaymentAuditLog.objects.bulk_create(buffer)
+        buffer.clear()
+
+
+@contextmanager
+def audited(request):
+    """Payment writes in this block commit together with their audit entries"""
+    with transaction.atomic():
+        yield
+        flush_payment_audit(request)
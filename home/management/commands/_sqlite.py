@@ -0,0 +1,12 @@
+from django.core.management.base import CommandError
+from django.db import connections
+
+
+def sqlite_path(alias):
+    """Filesystem path of the SQLite database behind connection `alias`"""
+    if alias not in connections.settings:
+        raise CommandError(f"Unknown database alias '{alias}'.")
+    db = connections.settings[alias]
+    if db["ENGINE"] != "django.db.backends.sqlite3":
+        raise CommandError(f"Database '{alias}' is not SQLite; use the server's own backup tools.")
+    return db["NAME"]
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from home.archive import archivable_years, archive_academic_year
+from home.models import Payment, academic_year_bounds, current_academic_year
+
+
+class Command(BaseCommand):
+    help = "Move payments of closed academic years into the archive table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--year", type=int, action="append", dest="years",
+            help="Starting year of the academic year to archive, e.g. 2024 for 2024-25 "
+                 "(repeatable). Defaults to every closed year.",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Only report how many payments each year would move.",
+        )
+
+    def handle(self, *args, **options):
+        years = options["years"] or archivable_years()
+        if not years:
+            self.stdout.write("Nothing to archive.")
+            return
+
+        # Refuse before touching anything, in dry runs too
+        still_open = [year for year in years if year >= current_academic_year()]
+        if still_open:
+            year = min(still_open)
+            raise CommandError(f"Academic year {year}-{str(year + 1)[-2:]} is still open.")
+
+        for year in sorted(years):
+            label = f"{year}-{str(year + 1)[-2:]}"
+            if options["dry_run"]:
+                start, end = academic_year_bounds(year)
+                count = Payment.objects.filter(date_paid__gte=start, date_paid__lt=end).count()
+                self.stdout.write(f"{label}: {count} payments would be archived")
+                continue
+            moved = archive_academic_year(year)
+            self.stdout.write(self.style.SUCCESS(f"{label}: archived {moved} payments"))
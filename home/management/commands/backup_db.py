@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from home.backup import MAX_RESTARTS, create_snapshot, rotate_snapshots
+
+from ._sqlite import sqlite_path
+
+
+class Command(BaseCommand):
+    help = "Take an online, compressed and checksummed snapshot of the SQLite database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default", help="Database alias to back up.")
+        parser.add_argument("--dest", default=settings.BACKUP_DIR, help="Directory for snapshots.")
+        parser.add_argument(
+            "--keep", type=int, default=settings.BACKUP_KEEP,
+            help="Number of snapshots to keep; older ones are deleted.",
+        )
+        parser.add_argument(
+            "--pages", type=int, default=1024,
+            help="Pages copied per backup step; smaller steps block writers for less time.",
+        )
+        parser.add_argument(
+            "--sleep", type=float, default=0.05,
+            help="Seconds to pause between steps so writers can get in.",
+        )
+
+    def handle(self, *args, **options):
+        if options["keep"] < 1:
+            raise CommandError("--keep must be at least 1, or the new snapshot would be deleted too.")
+        db_path = sqlite_path(options["database"])
+        snapshot, timings, restarts = create_snapshot(
+            db_path, options["dest"], pages=options["pages"], sleep=options["sleep"],
+        )
+
+        size_mb = snapshot.stat().st_size / (1024 * 1024)
+        self.stdout.write(self.style.SUCCESS(f"Snapshot written: {snapshot} ({size_mb:.1f} MB)"))
+        for phase, seconds in timings.items():
+            self.stdout.write(f"  {phase:<10} {seconds:8.2f} s")
+        if restarts:
+            self.stdout.write(f"  Copy restarted {restarts} times by concurrent writes"
+                              f"{'; finished in a single step' if restarts >= MAX_RESTARTS else ''}.")
+
+        for old in rotate_snapshots(options["dest"], options["keep"]):
+            self.stdout.write(f"Removed old snapshot {old.name}")
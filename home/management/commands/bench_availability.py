@@ -0,0 +1,79 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from home.allocation import free_beds, occupancy
+from home.models import SHARING_CHOICES, Allocation, Bed, Room, Student
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Time free-bed search and occupancy on generated rooms and allocations. "
+        "The data is created inside a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rooms", type=int, default=1000, help="Rooms to create (3 beds each).")
+        parser.add_argument("--stays", type=int, default=15, help="Back-to-back past stays per bed.")
+        parser.add_argument("--runs", type=int, default=20, help="Timed runs per query; the median is reported.")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._seed(options["rooms"], options["stays"])
+                self._bench(options["runs"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, room_count, stays):
+        rng = random.Random(0)
+        today = timezone.localdate()
+        students = Student.objects.bulk_create([
+            Student(fullname=f"Bench {i}", fathername="-", address="-", aadhar=f"9{i:011d}",
+                    college="-", studentphone="9999999999", fatherphone="9999999999",
+                    email=f"bench{i}@example.invalid", password="!")
+            for i in range(room_count * 3)
+        ])
+        rooms = Room.objects.bulk_create([
+            Room(number=f"B{i}", floor=i // 100, sharing=rng.choice(SHARING_CHOICES)[0])
+            for i in range(room_count)
+        ])
+        beds = Bed.objects.bulk_create([Bed(room=room, label=label) for room in rooms for label in "ABC"])
+
+        allocations = []
+        for bed in beds:
+            # History runs up to around today, so some beds are taken now
+            day = today - timedelta(days=stays * 90)
+            for _ in range(stays):
+                end = day + timedelta(days=rng.randint(30, 150))
+                allocations.append(Allocation(bed=bed, student=rng.choice(students), start_date=day, end_date=end))
+                day = end
+        Allocation.objects.bulk_create(allocations, batch_size=5000)
+        self.stdout.write(f"Seeded {len(beds)} beds and {len(allocations)} allocations.")
+
+    def _bench(self, runs):
+        today = timezone.localdate()
+        month = today + timedelta(days=30)
+        cases = [
+            ("free beds, any room", lambda: list(free_beds(today, month)[:50])),
+            ("free beds, floor 3", lambda: list(free_beds(today, month, floor=3)[:50])),
+            ("free beds, double sharing", lambda: list(free_beds(today, month, sharing="double")[:50])),
+            ("occupancy summary", lambda: list(occupancy(today))),
+        ]
+        for label, query in cases:
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                query()
+                timings.append((time.perf_counter() - start) * 1000)
+            self.stdout.write(f"{label:<28} median {statistics.median(timings):6.2f} ms, max {max(timings):6.2f} ms")
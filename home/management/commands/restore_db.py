@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from home.backup import SnapshotError, restore_snapshot
+
+from ._sqlite import sqlite_path
+
+
+class Command(BaseCommand):
+    help = "Verify a snapshot taken by backup_db and restore it into the SQLite database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("snapshot", help="Path to a db-*.sqlite3.gz snapshot.")
+        parser.add_argument("--database", default="default", help="Database alias to restore into.")
+        parser.add_argument(
+            "--noinput", "--no-input", action="store_false", dest="interactive",
+            help="Do not prompt for confirmation.",
+        )
+
+    def handle(self, *args, **options):
+        db_path = sqlite_path(options["database"])
+
+        if options["interactive"]:
+            confirm = input(
+                f"This will replace every row in {db_path} with {options['snapshot']}.\n"
+                "Type 'yes' to continue: "
+            )
+            if confirm != "yes":
+                self.stdout.write("Restore cancelled.")
+                return
+
+        connections[options["database"]].close()
+        try:
+            timings = restore_snapshot(options["snapshot"], db_path)
+        except (SnapshotError, FileNotFoundError) as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(self.style.SUCCESS(f"Restored {db_path} from {options['snapshot']}"))
+        for phase, seconds in timings.items():
+            self.stdout.write(f"  {phase:<10} {seconds:8.2f} s")
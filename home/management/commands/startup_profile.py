@@ -0,0 +1,92 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter so the numbers are a real cold start, the same
+# work a new gunicorn worker does before it can answer its first request.
+PROFILE_SCRIPT = r"""
+import json, sys, time
+
+paths, warmup = json.loads(sys.argv[1])
+report = {}
+
+start = time.perf_counter()
+import django
+django.setup()
+report["setup_ms"] = (time.perf_counter() - start) * 1000
+
+start = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns  # imports hostel.urls and every view module
+report["urls_ms"] = (time.perf_counter() - start) * 1000
+
+report["warmed"] = 0
+start = time.perf_counter()
+if warmup:
+    from home.startup import warm_templates
+    report["warmed"] = warm_templates()
+report["warmup_ms"] = (time.perf_counter() - start) * 1000
+
+report["heavy_modules"] = sorted(m for m in ("qrcode", "PIL") if m in sys.modules)
+
+from django.test import Client
+client = Client(raise_request_exception=False)
+report["requests"] = []
+for path in paths:
+    timings = []
+    for _ in range(2):
+        start = time.perf_counter()
+        response = client.get(path)
+        timings.append((time.perf_counter() - start) * 1000)
+    report["requests"].append({
+        "path": path, "status": response.status_code,
+        "first_ms": timings[0], "second_ms": timings[1],
+    })
+
+print(json.dumps(report))
+"""
+
+
+class Command(BaseCommand):
+    help = "Report cold-start import time and first-request latency of a new worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path", action="append", dest="paths",
+            help="URL path to request (repeatable). Defaults to / and /booking/.",
+        )
+        parser.add_argument(
+            "--no-warmup", action="store_true",
+            help="Skip template warmup to compare against a cold template cache.",
+        )
+
+    def handle(self, *args, **options):
+        paths = options["paths"] or ["/", "/booking/"]
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+            "DJANGO_SETTINGS_MODULE", "hostel.settings"))
+
+        result = subprocess.run(
+            [sys.executable, "-c", PROFILE_SCRIPT, json.dumps([paths, not options["no_warmup"]])],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Profiling process failed:\n{result.stderr}")
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+
+        total = report["setup_ms"] + report["urls_ms"] + report["warmup_ms"]
+        self.stdout.write(f"django.setup()      {report['setup_ms']:8.1f} ms")
+        self.stdout.write(f"URLconf + views     {report['urls_ms']:8.1f} ms")
+        self.stdout.write(f"Template warmup     {report['warmup_ms']:8.1f} ms ({report['warmed']} templates)")
+        self.stdout.write(f"Boot total          {total:8.1f} ms")
+        heavy = ", ".join(report["heavy_modules"]) or "none"
+        self.stdout.write(f"Heavy modules loaded at boot: {heavy}")
+        self.stdout.write("")
+        for req in report["requests"]:
+            self.stdout.write(
+                f"GET {req['path']:<20} [{req['status']}] "
+                f"first {req['first_ms']:7.1f} ms, second {req['second_ms']:7.1f} ms"
+            )
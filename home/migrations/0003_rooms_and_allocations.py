@@ -0,0 +1,52 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0002_payment_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Room',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.CharField(max_length=10, unique=True)),
+                ('floor', models.PositiveSmallIntegerField()),
+                ('sharing', models.CharField(choices=[('single', 'Single Room'), ('double', 'Double Sharing'), ('triple', 'Triple Sharing'), ('general', 'General Room')], max_length=10)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['sharing', 'floor'], name='room_sharing_floor_idx'), models.Index(fields=['floor'], name='room_floor_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Bed',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=10)),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='beds', to='home.room')),
+            ],
+            options={
+                'unique_together': {('room', 'label')},
+            },
+        ),
+        migrations.CreateModel(
+            name='Allocation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='allocations', to='home.student')),
+                ('bed', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='allocations', to='home.bed')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['end_date', 'start_date'], name='alloc_end_start_idx'), models.Index(fields=['bed', 'start_date'], name='alloc_bed_start_idx'), models.Index(fields=['student', 'start_date'], name='alloc_student_start_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('end_date__isnull', True), ('end_date__gt', models.F('start_date')), _connector='OR'), name='alloc_end_after_start')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:59
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0003_rooms_and_allocations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentAuditLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payment_id', models.BigIntegerField()),
+                ('action', models.CharField(choices=[('create', 'Created'), ('update', 'Updated'), ('delete', 'Deleted')], max_length=10)),
+                ('before', models.JSONField(blank=True, null=True)),
+                ('after', models.JSONField(blank=True, null=True)),
+                ('admin_id', models.IntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('student', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payment_audit_logs', to='home.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['student', 'created_at'], name='audit_student_created_idx'), models.Index(fields=['created_at'], name='audit_created_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,5 @@
+from datetime import date
+
 from django.db import models, IntegrityError
 from django.contrib.auth.hashers import make_password, check_password
 from django.core.validators import RegexValidator
@@ -21,6 +23,36 @@ MONTH_CHOICES = [
     ("September", "September"), ("October", "October"), ("November", "November"), ("December", "December")
 ]
 
+# ---------------------------
+# Room sharing types
+# ---------------------------
+SHARING_CHOICES = [
+    ("single", "Single Room"), ("double", "Double Sharing"),
+    ("triple", "Triple Sharing"), ("general", "General Room"),
+]
+
+# ---------------------------
+# Academic year
+# ---------------------------
+ACADEMIC_YEAR_START_MONTH = 6  # June – an academic year runs June..May
+
+
+def academic_year_for(day):
+    """Returns the starting calendar year of the academic year containing `day`"""
+    return day.year if day.month >= ACADEMIC_YEAR_START_MONTH else day.year - 1
+
+
+def academic_year_bounds(year):
+    """Returns (first_day, first_day_of_next_year) for academic year `year`"""
+    return (
+        date(year, ACADEMIC_YEAR_START_MONTH, 1),
+        date(year + 1, ACADEMIC_YEAR_START_MONTH, 1),
+    )
+
+
+def current_academic_year():
+    return academic_year_for(timezone.localdate())
+
 # ---------------------------
 # Student Model
 # ---------------------------
@@ -88,8 +120,124 @@ class Payment(models.Model):
     def __str__(self):
         return f"{self.student.fullname} • {self.month} • ₹{self.amount}"
 
-    # class Meta:
-    #     unique_together = ("student", "month")  # Ensures one record per student per month
+    class Meta:
+        # unique_together = ("student", "month")  # Ensures one record per student per month
+        indexes = [
+            # Per-student history pages filter by student and a date_paid range
+            models.Index(fields=["student", "date_paid"], name="payment_student_date_idx"),
+        ]
+
+# ---------------------------
+# ArchivedPayment Model
+# ---------------------------
+class ArchivedPayment(models.Model):
+    """Payments from closed academic years, moved out of the hot Payment table"""
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="archived_payments")
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    month = models.CharField(max_length=20, choices=MONTH_CHOICES)
+    date_paid = models.DateField()
+    academic_year = models.PositiveSmallIntegerField()
+    original_id = models.BigIntegerField(unique=True)  # Payment.id before archival
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.student.fullname} • {self.month} {self.academic_year} • ₹{self.amount}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["student", "date_paid"], name="archpay_student_date_idx"),
+            models.Index(fields=["academic_year"], name="archpay_year_idx"),
+        ]
+
+# ---------------------------
+# PaymentAuditLog Model
+# ---------------------------
+AUDIT_ACTION_CHOICES = [("create", "Created"), ("update", "Updated"), ("delete", "Deleted")]
+
+
+class PaymentAuditLog(models.Model):
+    """Append-only trail of payment changes; rows are written by home.audit"""
+    payment_id = models.BigIntegerField()  # not a FK: deleted payments keep their trail
+    student = models.ForeignKey(Student, on_delete=models.SET_NULL, null=True, related_name="payment_audit_logs")
+    action = models.CharField(max_length=10, choices=AUDIT_ACTION_CHOICES)
+    before = models.JSONField(blank=True, null=True)
+    after = models.JSONField(blank=True, null=True)
+    admin_id = models.IntegerField(blank=True, null=True)  # session admin_id, None for student changes
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise IntegrityError("Payment audit log entries cannot be modified.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise IntegrityError("Payment audit log entries cannot be deleted.")
+
+    def __str__(self):
+        return f"{self.get_action_display()} payment #{self.payment_id} at {self.created_at:%Y-%m-%d %H:%M}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["student", "created_at"], name="audit_student_created_idx"),
+            models.Index(fields=["created_at"], name="audit_created_idx"),
+        ]
+
+# ---------------------------
+# Room / Bed / Allocation Models
+# ---------------------------
+class Room(models.Model):
+    number = models.CharField(max_length=10, unique=True)
+    floor = models.PositiveSmallIntegerField()
+    sharing = models.CharField(max_length=10, choices=SHARING_CHOICES)
+
+    def __str__(self):
+        return f"Room {self.number} ({self.get_sharing_display()})"
+
+    class Meta:
+        indexes = [
+            # Availability search filters by floor and/or sharing type
+            models.Index(fields=["sharing", "floor"], name="room_sharing_floor_idx"),
+            models.Index(fields=["floor"], name="room_floor_idx"),
+        ]
+
+
+class Bed(models.Model):
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name="beds")
+    label = models.CharField(max_length=10)
+
+    def __str__(self):
+        return f"{self.room.number}-{self.label}"
+
+    class Meta:
+        unique_together = ("room", "label")
+
+
+class Allocation(models.Model):
+    """A student holding a bed from start_date up to (not including) end_date.
+    An open-ended stay has no end_date."""
+    bed = models.ForeignKey(Bed, on_delete=models.CASCADE, related_name="allocations")
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="allocations")
+    start_date = models.DateField()
+    end_date = models.DateField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.student.fullname} • {self.bed} • {self.start_date}→{self.end_date or '…'}"
+
+    class Meta:
+        indexes = [
+            # Overlap lookups: end_date > ? OR end_date IS NULL – only current and future stays
+            models.Index(fields=["end_date", "start_date"], name="alloc_end_start_idx"),
+            # Per-bed check when booking
+            models.Index(fields=["bed", "start_date"], name="alloc_bed_start_idx"),
+            models.Index(fields=["student", "start_date"], name="alloc_student_start_idx"),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(end_date__isnull=True) | models.Q(end_date__gt=models.F("start_date")),
+                name="alloc_end_after_start",
+            ),
+        ]
 
 # ---------------------------
 # Signals
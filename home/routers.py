@@ -0,0 +1,64 @@
+"""
+Read-replica routing.
+
+Views wrapped in ``read_from_replica`` send their reads of this app's tables to
+the ``replica`` database alias (when one is configured); everything else,
+including every write, stays on ``default``. After a session writes payments it
+is pinned to ``default`` for ``REPLICA_STICKY_SECONDS`` so the page it is
+redirected to always shows its own change, whatever the replica's lag.
+"""
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+REPLICA_ALIAS = "replica"
+PIN_SESSION_KEY = "db_pinned_until"
+
+_replica_reads = ContextVar("replica_reads", default=False)
+
+
+def pin_to_primary(request):
+    """Reads for this session go to the primary for the next few seconds"""
+    request.session[PIN_SESSION_KEY] = time.time() + settings.REPLICA_STICKY_SECONDS
+
+
+def _is_pinned(request):
+    return request.session.get(PIN_SESSION_KEY, 0) > time.time()
+
+
+def read_from_replica(view_func):
+    """Route the view's reads to the replica for GETs from unpinned sessions"""
+    @wraps(view_func)
+    def _wrapped(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD") or _is_pinned(request):
+            return view_func(request, *args, **kwargs)
+        token = _replica_reads.set(True)
+        try:
+            return view_func(request, *args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+    return _wrapped
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if (
+            _replica_reads.get()
+            and model._meta.app_label == "home"
+            and REPLICA_ALIAS in settings.DATABASES
+        ):
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica's schema comes from replication, not from migrate
+        return db != REPLICA_ALIAS
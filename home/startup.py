@@ -0,0 +1,38 @@
+"""
+Worker boot helpers.
+
+Templates are served through the cached loader (see ``TEMPLATES`` in settings),
+so each gunicorn worker compiles a template once and reuses it afterwards.
+``warm_templates`` does that compile step at boot instead of on the first
+request that happens to hit each page.
+"""
+from pathlib import Path
+
+from django.template import TemplateSyntaxError, engines
+
+
+def project_template_names():
+    """All ``.html`` templates under the project's template ``DIRS``."""
+    names = set()
+    for directory in engines["django"].engine.dirs:
+        root = Path(directory)
+        if not root.is_dir():
+            continue
+        for path in root.rglob("*.html"):
+            names.add(path.relative_to(root).as_posix())
+    return sorted(names)
+
+
+def warm_templates(names=None):
+    """Compile templates into the cached loader. Returns the number loaded."""
+    engine = engines["django"]
+    loaded = 0
+    for name in names or project_template_names():
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError as exc:
+            # A broken template should fail its own page, not the whole worker
+            print(f"⚠️ Template warmup skipped {name}: {exc}")
+            continue
+        loaded += 1
+    return loaded
@@ -0,0 +1,415 @@
+import sqlite3
+import tempfile
+from contextlib import closing
+from datetime import date
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.db import DatabaseError, IntegrityError, connection, connections, router
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .allocation import AllocationError, allocate_bed, free_beds, occupancy, overlapping
+from .archive import archivable_years, archive_academic_year
+from .backup import SnapshotError, create_snapshot, restore_snapshot, verify_snapshot
+from .routers import ReplicaRouter, pin_to_primary, read_from_replica
+from .models import (
+    Allocation, ArchivedPayment, Bed, Payment, PaymentAuditLog, Room, Student, academic_year_bounds,
+    current_academic_year,
+)
+
+
+def make_student(n=1):
+    return Student.objects.create(
+        fullname=f"Student {n}", fathername="Father", address="Address",
+        aadhar=f"{n:012d}", college="College", studentphone="9999999999",
+        fatherphone="9999999999", email=f"student{n}@example.com", password="x",
+    )
+
+
+class AllocationTests(TestCase):
+    def setUp(self):
+        self.single = Room.objects.create(number="101", floor=1, sharing="single")
+        self.double = Room.objects.create(number="201", floor=2, sharing="double")
+        self.bed = Bed.objects.create(room=self.single, label="A")
+        self.bed_b1 = Bed.objects.create(room=self.double, label="A")
+        self.bed_b2 = Bed.objects.create(room=self.double, label="B")
+        self.student = make_student(1)
+        self.other = make_student(2)
+
+    def stay(self, bed, start, end=None, student=None):
+        return Allocation.objects.create(
+            bed=bed, student=student or self.student, start_date=start, end_date=end,
+        )
+
+    def overlaps(self, start, end=None):
+        return overlapping(self.bed.allocations.all(), start, end).exists()
+
+    # --- overlapping() boundaries ---
+
+    def test_range_is_half_open(self):
+        self.stay(self.bed, date(2026, 1, 10), date(2026, 1, 20))
+        self.assertTrue(self.overlaps(date(2026, 1, 19), date(2026, 1, 25)))
+        self.assertTrue(self.overlaps(date(2026, 1, 1), date(2026, 1, 11)))
+        # Check-out day is free, and a stay ending on check-in day doesn't clash
+        self.assertFalse(self.overlaps(date(2026, 1, 20), date(2026, 1, 25)))
+        self.assertFalse(self.overlaps(date(2026, 1, 1), date(2026, 1, 10)))
+
+    def test_open_ended_stay_blocks_everything_after_its_start(self):
+        self.stay(self.bed, date(2026, 1, 10))
+        self.assertTrue(self.overlaps(date(2030, 1, 1), date(2030, 2, 1)))
+        self.assertTrue(self.overlaps(date(2026, 1, 1)))
+        self.assertFalse(self.overlaps(date(2026, 1, 1), date(2026, 1, 10)))
+
+    def test_open_ended_request_overlaps_any_later_stay(self):
+        self.stay(self.bed, date(2026, 3, 1), date(2026, 4, 1))
+        self.assertTrue(self.overlaps(date(2026, 1, 1)))
+        self.assertFalse(self.overlaps(date(2026, 4, 1)))
+
+    def test_back_to_back_stays_can_be_booked(self):
+        allocate_bed(self.student, self.bed.id, date(2026, 1, 1), date(2026, 2, 1))
+        allocate_bed(self.other, self.bed.id, date(2026, 2, 1), date(2026, 3, 1))
+        self.assertEqual(self.bed.allocations.count(), 2)
+
+    # --- free_beds() / occupancy() ---
+
+    def test_free_beds_excludes_taken_beds_and_filters(self):
+        self.stay(self.bed_b1, date(2026, 1, 1), date(2026, 2, 1))
+        free = list(free_beds(date(2026, 1, 15), date(2026, 1, 20)))
+        self.assertEqual(free, [self.bed, self.bed_b2])
+        self.assertEqual(list(free_beds(date(2026, 2, 1), floor=2)), [self.bed_b1, self.bed_b2])
+        self.assertEqual(list(free_beds(date(2026, 1, 15), sharing="single")), [self.bed])
+
+    def test_free_beds_is_one_indexed_query(self):
+        self.stay(self.bed, date(2026, 1, 1), date(2026, 2, 1))
+        beds = free_beds(date(2026, 1, 15), date(2026, 1, 20))
+        with self.assertNumQueries(1):
+            list(beds)
+        if connection.vendor == "sqlite":
+            sql, params = beds.query.sql_with_params()
+            with connection.cursor() as cursor:
+                plan = " ".join(str(row) for row in cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+            self.assertIn("alloc_end_start_idx", plan)
+
+    def test_occupancy_counts_per_sharing_type(self):
+        self.stay(self.bed_b1, date(2026, 1, 1), date(2026, 2, 1))
+        self.stay(self.bed_b2, date(2026, 1, 16))
+        self.stay(self.bed, date(2025, 1, 1), date(2026, 1, 15), student=self.other)
+        rows = {row["room__sharing"]: (row["total"], row["free"]) for row in occupancy(date(2026, 1, 15))}
+        self.assertEqual(rows, {"double": (2, 1), "single": (1, 1)})
+
+    # --- allocate_bed() errors ---
+
+    def test_double_booking_a_bed_is_rejected(self):
+        allocate_bed(self.student, self.bed.id, date(2026, 1, 1), date(2026, 2, 1))
+        with self.assertRaisesMessage(AllocationError, "already booked"):
+            allocate_bed(self.other, self.bed.id, date(2026, 1, 31), date(2026, 3, 1))
+
+    def test_student_cannot_hold_two_beds_at_once(self):
+        allocate_bed(self.student, self.bed.id, date(2026, 1, 1))
+        with self.assertRaisesMessage(AllocationError, "already have a bed"):
+            allocate_bed(self.student, self.bed_b1.id, date(2026, 6, 1), date(2026, 7, 1))
+
+    def test_invalid_requests_are_rejected(self):
+        with self.assertRaisesMessage(AllocationError, "after check-in"):
+            allocate_bed(self.student, self.bed.id, date(2026, 1, 1), date(2026, 1, 1))
+        with self.assertRaisesMessage(AllocationError, "does not exist"):
+            allocate_bed(self.student, 999999, date(2026, 1, 1))
+        self.assertFalse(Allocation.objects.exists())
+
+    def test_search_with_backwards_range_ignores_check_out(self):
+        self.stay(self.bed, date(2026, 1, 1), date(2026, 2, 1))
+        response = self.client.get(reverse("booking"), {"check_in": "2026-01-20", "check_out": "2026-01-10"})
+        self.assertContains(response, "Check-out date must be after check-in date.")
+        self.assertIsNone(response.context["check_out"])
+        self.assertNotIn(self.bed, response.context["free_beds"])
+
+
+class PaymentArchiveTests(TestCase):
+    def setUp(self):
+        self.student = make_student(1)
+        self.open_year = current_academic_year()
+        self.closed_year = self.open_year - 2
+        start, _ = academic_year_bounds(self.closed_year)
+        self.old = [
+            Payment.objects.create(student=self.student, month="July", amount=100 + i,
+                                   date_paid=start.replace(day=1 + i))
+            for i in range(5)
+        ]
+        open_start, _ = academic_year_bounds(self.open_year)
+        self.current = Payment.objects.create(student=self.student, month="June", amount=500, date_paid=open_start)
+
+    def test_archivable_years_lists_closed_years_from_oldest_payment(self):
+        self.assertEqual(archivable_years(), [self.closed_year, self.closed_year + 1])
+
+    def test_archive_moves_rows_in_batches(self):
+        with CaptureQueriesContext(connection) as queries:
+            moved = archive_academic_year(self.closed_year, batch_size=2)
+        self.assertEqual(moved, 5)
+        deletes = [q for q in queries.captured_queries if q["sql"].startswith("DELETE")]
+        self.assertEqual(len(deletes), 3)
+
+        self.assertEqual(list(Payment.objects.all()), [self.current])
+        archived = {a.original_id: a for a in ArchivedPayment.objects.all()}
+        self.assertEqual(set(archived), {p.id for p in self.old})
+        for payment in self.old:
+            row = archived[payment.id]
+            self.assertEqual(
+                (row.student_id, row.amount, row.month, row.date_paid, row.academic_year),
+                (payment.student_id, payment.amount, payment.month, payment.date_paid, self.closed_year),
+            )
+
+    def test_open_year_cannot_be_archived(self):
+        with self.assertRaises(ValueError):
+            archive_academic_year(self.open_year)
+        for args in (["--year", str(self.open_year)], ["--year", str(self.open_year), "--dry-run"]):
+            with self.assertRaisesMessage(CommandError, "still open"):
+                call_command("archive_payments", *args, stdout=StringIO())
+        self.assertEqual(Payment.objects.count(), 6)
+
+    def test_dry_run_changes_nothing(self):
+        out = StringIO()
+        call_command("archive_payments", "--dry-run", stdout=out)
+        self.assertIn("5 payments would be archived", out.getvalue())
+        self.assertFalse(ArchivedPayment.objects.exists())
+
+
+class PaymentHistoryViewTests(TestCase):
+    def setUp(self):
+        self.student = make_student(1)
+        session = self.client.session
+        session["role"] = "student"
+        session["student_id"] = self.student.id
+        session.save()
+
+    def test_empty_older_history_says_so(self):
+        response = self.client.get(reverse("student_payments_self") + "?history=1")
+        self.assertContains(response, "No older payments.")
+        self.assertNotContains(response, "Show older payments")
+
+    def test_admin_edit_page_lists_current_year_only(self):
+        year_start, _ = academic_year_bounds(current_academic_year())
+        current = Payment.objects.create(student=self.student, month="June", amount=10, date_paid=year_start)
+        Payment.objects.create(student=self.student, month="May", amount=20, date_paid=date(year_start.year - 1, 6, 1))
+        session = self.client.session
+        session["role"] = "admin"
+        session["admin_id"] = 1
+        session.save()
+        response = self.client.get(reverse("manage_payment", args=[self.student.id]))
+        self.assertEqual(list(response.context["payments"]), [current])
+        self.assertContains(response, "?history=1")
+
+    def test_older_history_is_not_loaded_by_default(self):
+        response = self.client.get(reverse("student_payments_self"))
+        self.assertIsNone(response.context["history_page"])
+        self.assertContains(response, "Show older payments")
+
+
+class PaymentAuditTests(TestCase):
+    def setUp(self):
+        self.student = make_student(1)
+        self.payment = Payment.objects.create(student=self.student, month="July", amount=100)
+        self.payment.refresh_from_db()
+        session = self.client.session
+        session["role"] = "admin"
+        session["admin_id"] = 1
+        session.save()
+
+    def edit(self, amount):
+        url = reverse("manage_payment", args=[self.student.id]) + f"?payment_id={self.payment.id}"
+        return self.client.post(url, {"month": "August", "amount": amount})
+
+    def test_edit_records_before_and_after(self):
+        self.edit("150")
+        log = PaymentAuditLog.objects.get()
+        self.assertEqual((log.action, log.payment_id, log.student_id, log.admin_id), ("update", self.payment.id, self.student.id, 1))
+        self.assertEqual(log.before["amount"], "100.00")
+        self.assertEqual(log.after, {"month": "August", "amount": "150.00", "date_paid": str(self.payment.date_paid)})
+
+    def test_audit_adds_one_query_per_request(self):
+        with mock.patch("home.views.record_payment_change"), CaptureQueriesContext(connection) as unaudited:
+            self.edit("120")
+        # The audit INSERT joins the write's transaction; nothing else is added
+        with self.assertNumQueries(len(unaudited) + 1):
+            self.edit("150")
+        self.assertEqual(PaymentAuditLog.objects.count(), 1)
+
+    def test_delete_keeps_trail(self):
+        payment_id = self.payment.id
+        self.client.get(reverse("delete_payment", args=[payment_id]))
+        log = PaymentAuditLog.objects.get()
+        self.assertEqual((log.action, log.payment_id, log.after), ("delete", payment_id, None))
+        self.assertFalse(Payment.objects.filter(id=payment_id).exists())
+
+    def test_failed_audit_write_rolls_back_the_payment_change(self):
+        with mock.patch.object(PaymentAuditLog.objects, "bulk_create", side_effect=DatabaseError("locked")):
+            with self.assertRaises(DatabaseError):
+                self.edit("999")
+        self.payment.refresh_from_db()
+        self.assertEqual((self.payment.month, self.payment.amount), ("July", 100))
+
+    def test_log_rows_are_append_only(self):
+        self.edit("150")
+        log = PaymentAuditLog.objects.get()
+        with self.assertRaises(IntegrityError):
+            log.save()
+        with self.assertRaises(IntegrityError):
+            log.delete()
+
+
+class BackupCommandTests(TestCase):
+    def test_empty_checksum_file_is_a_snapshot_error(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            snapshot = Path(tmp) / "db-20260101-000000-000000.sqlite3.gz"
+            snapshot.write_bytes(b"")
+            Path(f"{snapshot}.sha256").write_text("")
+            with self.assertRaisesMessage(SnapshotError, "is empty"):
+                verify_snapshot(snapshot)
+
+    def test_snapshot_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "source.sqlite3"
+            target = Path(tmp) / "target.sqlite3"
+            with closing(sqlite3.connect(source)) as conn:
+                conn.execute("CREATE TABLE t (x)")
+                conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(100)])
+                conn.commit()
+            snapshot, _, restarts = create_snapshot(source, Path(tmp) / "backups")
+            self.assertEqual(restarts, 0)
+            restore_snapshot(snapshot, target)
+            with closing(sqlite3.connect(target)) as conn:
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 100)
+
+    def test_keep_below_one_is_rejected(self):
+        for keep in ("0", "-1"):
+            with self.assertRaisesMessage(CommandError, "--keep must be at least 1"):
+                call_command("backup_db", "--keep", keep, stdout=StringIO())
+
+
+class ReplicaTestCase(TestCase):
+    """Adds a separate, empty 'replica' database that nothing replicates into,
+    i.e. a replica that hasn't caught up with anything written in the test.
+    The alias only exists while the class runs, so the test runner never sees it."""
+
+    @classmethod
+    def setUpClass(cls):
+        replica = connections.configure_settings({
+            "default": settings.DATABASES["default"],
+            "replica": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"},
+        })["replica"]
+        cls._replica_patches = [
+            mock.patch.dict(settings.DATABASES, {"replica": replica}),
+            mock.patch.dict(connections.settings, {"replica": replica}),
+        ]
+        for patch in cls._replica_patches:
+            patch.start()
+        with connections["replica"].schema_editor() as editor:
+            for model in apps.get_app_config("home").get_models():
+                editor.create_model(model)
+        cls.databases = {"default", "replica"}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        del cls.databases
+        connections["replica"].close()
+        del connections["replica"]
+        for patch in reversed(cls._replica_patches):
+            patch.stop()
+
+
+class ReplicaReadYourWritesTests(ReplicaTestCase):
+    def setUp(self):
+        self.student = make_student(1)
+        self.student.set_password("secret")
+        self.student.save()
+
+    def test_new_student_can_open_own_page_after_login(self):
+        response = self.client.post(reverse("login"), {"username": self.student.email, "password": "secret"})
+        self.assertRedirects(response, reverse("student_payments_self"), fetch_redirect_response=False)
+        response = self.client.get(reverse("student_payments_self"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["student"], self.student)
+
+    def test_own_row_falls_back_to_primary_after_pin_expires(self):
+        session = self.client.session
+        session["role"] = "student"
+        session["student_id"] = self.student.id
+        session.save()
+        response = self.client.get(reverse("student_payments_self"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_signup_pins_session(self):
+        self.client.post(reverse("signup"), {
+            "fullname": "New Student", "email": "new@example.com", "password": "pw",
+            "fathername": "Father", "address": "Address", "aadhar": "999999999999",
+            "college": "College", "studentphone": "9999999999", "fatherphone": "9999999999",
+            "joiningdate": "2026-06-01",
+        })
+        self.assertTrue(Student.objects.filter(email="new@example.com").exists())
+        self.assertIn("db_pinned_until", self.client.session)
+
+
+@read_from_replica
+def _routing_probe(request):
+    return HttpResponse(f"{router.db_for_read(Student)},{router.db_for_read(Session)}")
+
+
+class ReplicaRouterTests(ReplicaTestCase):
+    def request(self, method="get", pinned=False):
+        request = getattr(RequestFactory(), method)("/")
+        request.session = SessionStore()
+        if pinned:
+            pin_to_primary(request)
+        return request
+
+    def test_unpinned_get_reads_home_models_from_replica(self):
+        self.assertEqual(_routing_probe(self.request()).content, b"replica,default")
+        self.assertEqual(_routing_probe(self.request("head")).content, b"replica,default")
+
+    def test_post_stays_on_default(self):
+        self.assertEqual(_routing_probe(self.request("post")).content, b"default,default")
+
+    def test_pinned_session_stays_on_default_until_window_ends(self):
+        request = self.request(pinned=True)
+        self.assertEqual(_routing_probe(request).content, b"default,default")
+        with mock.patch("home.routers.time.time", return_value=request.session["db_pinned_until"] + 1):
+            self.assertEqual(_routing_probe(request).content, b"replica,default")
+
+    @override_settings(REPLICA_STICKY_SECONDS=60)
+    def test_pin_window_follows_setting(self):
+        request = self.request(pinned=True)
+        with mock.patch("home.routers.time.time", return_value=request.session["db_pinned_until"] - 59):
+            self.assertEqual(_routing_probe(request).content, b"default,default")
+
+    def test_reads_outside_wrapped_views_use_default(self):
+        self.assertIsNone(ReplicaRouter().db_for_read(Student))
+        self.assertEqual(ReplicaRouter().db_for_write(Student), "default")
+
+    def test_list_view_reads_replica_rows(self):
+        make_student(1)  # only on default
+        Student.objects.using("replica").create(
+            fullname="Replica Only", fathername="F", address="A", aadhar="888888888888",
+            college="C", studentphone="9999999999", fatherphone="9999999999",
+            email="replica@example.com", password="x",
+        )
+        session = self.client.session
+        session["role"] = "admin"
+        session["admin_id"] = 1
+        session.save()
+        response = self.client.get(reverse("admin_student_list"))
+        self.assertEqual([s.fullname for s in response.context["students"]], ["Replica Only"])
+
+    def test_migrate_skips_replica(self):
+        self.assertFalse(ReplicaRouter().allow_migrate("replica", "home"))
+        self.assertTrue(ReplicaRouter().allow_migrate("default", "home"))
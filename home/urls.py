@@ -21,6 +21,7 @@ urlpatterns = [
     path("myadmin/student/<int:student_id>/payments/", views.admin_student_payments, name="admin_student_payments"),
     path("myadmin/manage-payment/<int:student_id>/", views.manage_payment, name="manage_payment"),
     path("delete-payment/<int:payment_id>/", views.delete_payment, name="delete_payment"),
+    path("myadmin/audit-log/", views.payment_audit_log, name="payment_audit_log"),
    
     #payment 
     path("book/<str:plan>/", views.book_now, name="book_now"),
@@ -1,7 +1,8 @@
 from decimal import Decimal
-from datetime import datetime
+from datetime import datetime, timedelta
 from django.http import JsonResponse
-from django.db.models import Sum
+from django.db.models import Sum, Value
+from django.core.paginator import Paginator
 from django.http import HttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
@@ -10,8 +11,13 @@ from django.db import IntegrityError, models
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
 from django.views.decorators.csrf import csrf_exempt
-from .models import Student, AdminUser, Payment, MONTH_CHOICES
-import qrcode
+from .models import (
+    Student, AdminUser, Payment, PaymentAuditLog, MONTH_CHOICES, SHARING_CHOICES,
+    academic_year_bounds, current_academic_year,
+)
+from .allocation import AllocationError, allocate_bed, free_beds, occupancy
+from .routers import pin_to_primary, read_from_replica
+from .audit import audited, payment_snapshot, record_payment_change
 import base64
 from io import BytesIO
 from urllib.parse import quote
@@ -42,6 +48,37 @@ def require_role(role):
     return decorator
 
 
+HISTORY_PAGE_SIZE = 20
+
+def _current_year_payments(student):
+    """(payments of the open academic year, its label, its first day)"""
+    year = current_academic_year()
+    year_start, _ = academic_year_bounds(year)
+    payments = student.payments.filter(date_paid__gte=year_start).order_by("-date_paid")
+    return payments, f"{year}-{str(year + 1)[-2:]}", year_start
+
+def _payment_history_context(request, student):
+    """Current academic year's payments; older history is paginated and only
+    queried when asked for with ?history=<page>."""
+    payments, academic_year, year_start = _current_year_payments(student)
+    context = {
+        "payments": payments,
+        "academic_year": academic_year,
+        "history_page": None,
+    }
+
+    page_number = request.GET.get("history")
+    if page_number:
+        fields = ("id", "month", "amount", "date_paid")
+        # Closed years live in ArchivedPayment once archived; anything not yet
+        # archived is still in Payment, so show both.
+        older = student.payments.filter(date_paid__lt=year_start).values(*fields).annotate(archived=Value(False))
+        archived = student.archived_payments.values(*fields).annotate(archived=Value(True))
+        history = older.union(archived, all=True).order_by("-date_paid", "-id")
+        context["history_page"] = Paginator(history, HISTORY_PAGE_SIZE).get_page(page_number)
+    return context
+
+
 # ---------------------------
 # Static pages
 # ---------------------------
@@ -57,8 +94,64 @@ def contact(request):
 def rooms(request):
     return render(request, "rooms.html")
 
+FREE_BEDS_SHOWN = 50
+
+def _parse_stay(data, default_start):
+    """Returns (start, end) from check_in/check_out fields; end may be None"""
+    start = data.get("check_in") or ""
+    end = data.get("check_out") or ""
+    start = datetime.strptime(start, "%Y-%m-%d").date() if start else default_start
+    end = datetime.strptime(end, "%Y-%m-%d").date() if end else None
+    return start, end
+
 def booking(request):
-    return render(request, "booking.html")
+    today = timezone.localdate()
+
+    if request.method == "POST":
+        if not _is_student(request):
+            messages.error(request, "Please log in as a student to book a bed.")
+            return redirect("login")
+        student = get_object_or_404(Student, id=request.session.get("student_id"))
+        try:
+            start, end = _parse_stay(request.POST, today)
+            bed_id = int(request.POST.get("bed_id", ""))
+        except ValueError:
+            messages.error(request, "Invalid booking request.")
+            return redirect("booking")
+        if start < today:
+            messages.error(request, "Check-in date cannot be in the past.")
+            return redirect("booking")
+        try:
+            allocation = allocate_bed(student, bed_id, start, end)
+        except AllocationError as exc:
+            messages.error(request, str(exc))
+        else:
+            messages.success(request, f"Bed {allocation.bed} booked from {start}.")
+        return redirect("booking")
+
+    try:
+        start, end = _parse_stay(request.GET, today)
+    except ValueError:
+        messages.error(request, "Dates must be in YYYY-MM-DD format.")
+        start, end = today, None
+    if end is not None and end <= start:
+        # A backwards range matches almost no allocations and would list taken beds as free
+        messages.error(request, "Check-out date must be after check-in date.")
+        end = None
+    floor = request.GET.get("floor", "")
+    sharing = request.GET.get("sharing", "")
+
+    beds = free_beds(start, end, floor=int(floor) if floor.isdigit() else None, sharing=sharing)
+    return render(request, "booking.html", {
+        "occupancy": occupancy(today),
+        "free_beds": beds[:FREE_BEDS_SHOWN],
+        "check_in": start,
+        "check_out": end,
+        "floor": floor,
+        "sharing": sharing,
+        "sharing_choices": SHARING_CHOICES,
+        "is_student": _is_student(request),
+    })
 
 
 # ---------------------------
@@ -153,6 +246,7 @@ def signup(request):
 
             try:
                 student.save()
+                pin_to_primary(request)
                 messages.success(request, "Student account created successfully! Please log in.")
                 return redirect("login")
             except IntegrityError:
@@ -202,6 +296,7 @@ def login(request):
                   Student.objects.filter(fullname=username).first()
         if student and student.check_password(password):
             request.session.flush()  # flush old session
+            pin_to_primary(request)  # the replica may not have this student yet
             request.session["role"] = "student"
             request.session["student_id"] = student.id
             return redirect("student_payments_self")
@@ -234,25 +329,32 @@ def logout(request):
 # ---------------------------
 @never_cache
 @require_role("student")
+@read_from_replica
 def student_payments_self(request):
     student_id = request.session.get("student_id")
     if not student_id:
         return redirect("login")
 
-    student = get_object_or_404(Student, id=student_id)
+    # A brand-new student may not have reached the replica yet; their own row
+    # must never 404, so fall back to the primary
+    student = (
+        Student.objects.filter(id=student_id).first()
+        or get_object_or_404(Student.objects.using("default"), id=student_id)
+    )
 
     if request.method == "POST":
         month = request.POST.get("month")
         amount = request.POST.get("amount")
         if month and amount:
-            Payment.objects.create(student=student, month=month, amount=amount)
+            with audited(request):
+                payment = Payment.objects.create(student=student, month=month, amount=amount)
+                record_payment_change(request, "create", payment)
+            pin_to_primary(request)
             return redirect("student_payments_self")
 
-    payments = student.payments.all().order_by("-date_paid")
-
     return render(request, "students_payments.html", {
         "student": student,
-        "payments": payments,
+        **_payment_history_context(request, student),
         "is_admin": False,
         "is_student": True
     })
@@ -297,25 +399,31 @@ def manage_payment(request, student_id):
         month = request.POST.get("month")
         amount = request.POST.get("amount")
 
-        if payment:
-            # Update existing payment
-            payment.month = month
-            payment.amount = amount
-            payment.save()
-        else:
-            # Add new payment
-            Payment.objects.create(student=student, month=month, amount=amount)
+        with audited(request):
+            if payment:
+                # Update existing payment
+                before = payment_snapshot(payment)
+                payment.month = month
+                payment.amount = amount
+                payment.save()
+                record_payment_change(request, "update", payment, before=before)
+            else:
+                # Add new payment
+                payment = Payment.objects.create(student=student, month=month, amount=amount)
+                record_payment_change(request, "create", payment)
+        pin_to_primary(request)
 
         # After save → back to student’s payments list
         return redirect("admin_student_payments", student_id=student.id)
 
-    # Fetch all payments for this student (so admin can see history below form)
-    payments = Payment.objects.filter(student=student).order_by("-id")
+    # Current academic year only; older rows are on the payments page's ?history=
+    payments, academic_year, _ = _current_year_payments(student)
 
     return render(request, "manage_payment.html", {
         "student": student,
         "payment": payment,
         "payments": payments,
+        "academic_year": academic_year,
         "student_id": student.id,   # ✅ So template can use in `{% url %}`
     })
 
@@ -325,6 +433,7 @@ def manage_payment(request, student_id):
 # ---------------------------
 @never_cache
 @require_role("admin")
+@read_from_replica
 def admin_student_payments(request, student_id):
     student = get_object_or_404(Student, id=student_id)
 
@@ -332,13 +441,15 @@ def admin_student_payments(request, student_id):
         month = request.POST.get("month")
         amount = request.POST.get("amount")
         if month and amount:
-            Payment.objects.create(student=student, month=month, amount=amount)
+            with audited(request):
+                payment = Payment.objects.create(student=student, month=month, amount=amount)
+                record_payment_change(request, "create", payment)
+            pin_to_primary(request)
             return redirect("admin_student_payments", student_id=student.id)
 
-    payments = student.payments.all().order_by("-date_paid")
     return render(request, "students_payments.html", {
         "student": student,
-        "payments": payments,
+        **_payment_history_context(request, student),
         "is_admin": True,
         "is_student": False
     })
@@ -350,17 +461,54 @@ def delete_payment(request, payment_id):
 
     payment = get_object_or_404(Payment, id=payment_id)
     student_id = payment.student.id
-    payment.delete()
+    with audited(request):
+        record_payment_change(request, "delete", payment, before=payment_snapshot(payment))
+        payment.delete()
+    pin_to_primary(request)
 
     return redirect("admin_student_payments", student_id=student_id)
 
 @never_cache
 @require_role("admin")
+@read_from_replica
 def admin_student_list(request):
     students = Student.objects.all()
     return render(request, "admin_student_list.html", {"students": students})
 
 
+AUDIT_PAGE_SIZE = 50
+
+@never_cache
+@require_role("admin")
+@read_from_replica
+def payment_audit_log(request):
+    """Admin view of payment changes, filterable by student and date range"""
+    logs = PaymentAuditLog.objects.select_related("student").order_by("-created_at", "-id")
+
+    student_id = request.GET.get("student", "")
+    if student_id.isdigit():
+        logs = logs.filter(student_id=student_id)
+    # Compare created_at against datetimes (not __date) so the index is used
+    try:
+        date_from = request.GET.get("from", "")
+        if date_from:
+            start = timezone.make_aware(datetime.strptime(date_from, "%Y-%m-%d"))
+            logs = logs.filter(created_at__gte=start)
+        date_to = request.GET.get("to", "")
+        if date_to:
+            end = timezone.make_aware(datetime.strptime(date_to, "%Y-%m-%d")) + timedelta(days=1)
+            logs = logs.filter(created_at__lt=end)
+    except ValueError:
+        messages.error(request, "Dates must be in YYYY-MM-DD format.")
+
+    return render(request, "payment_audit_log.html", {
+        "page": Paginator(logs, AUDIT_PAGE_SIZE).get_page(request.GET.get("page")),
+        "student_id": student_id,
+        "date_from": request.GET.get("from", ""),
+        "date_to": request.GET.get("to", ""),
+    })
+
+
 #payment environment
 
 PLAN_AMOUNTS = {
@@ -374,6 +522,9 @@ EDITABLE_PLANS = ["monthly", "yearly"]  # ✅ user can edit only these
 
 def generate_qr_code(data: str) -> str:
     """Generate base64 QR code from given string."""
+    # qrcode pulls in PIL; import it here so only book_now pays for it
+    import qrcode
+
     qr = qrcode.make(data)
     buffer = BytesIO()
     qr.save(buffer, format="PNG")
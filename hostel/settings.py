@@ -1,6 +1,8 @@
 import os
 from pathlib import Path
 
+import dj_database_url
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 # SECURITY
@@ -38,8 +40,15 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates', BASE_DIR / 'home' / 'templates'],
-        'APP_DIRS': True,
+        'APP_DIRS': False,  # app templates come from the loaders below
         'OPTIONS': {
+            # Compiled templates are kept per worker; hostel/wsgi.py warms them on boot
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
@@ -56,9 +65,34 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',  # change to Postgres if needed
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Take the write lock at BEGIN so concurrent bed bookings queue up
+        # instead of failing with "database is locked" on upgrade
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
     }
 }
 
+# Optional read replica for list and payment-history pages, set as a URL:
+#   REPLICA_DATABASE_URL=postgres://...      a streaming replica of the primary
+#   REPLICA_DATABASE_URL=sqlite:////srv/hostel/replica.sqlite3
+# Nothing in this project replicates into a SQLite file (migrate skips the
+# replica alias), so refresh it from the newest backup on a schedule, e.g.
+#   python manage.py backup_db && \
+#   python manage.py restore_db "$(ls backups/db-*.sqlite3.gz | tail -n 1)" --database replica --noinput
+# and set REPLICA_STICKY_SECONDS to at least that interval, otherwise a user's
+# own payment can vanish from their page until the next refresh.
+REPLICA_DATABASE_URL = os.environ.get('REPLICA_DATABASE_URL')
+if REPLICA_DATABASE_URL:
+    DATABASES['replica'] = dj_database_url.parse(REPLICA_DATABASE_URL)
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['home.routers.ReplicaRouter']
+# Read-your-writes window after a payment write; must cover the replica's lag
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 10))
+
+# SQLite snapshots (manage.py backup_db / restore_db)
+BACKUP_DIR = BASE_DIR / 'backups'
+BACKUP_KEEP = 7
+
 # Password validators
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',},
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hostel.settings')
 
 application = get_wsgi_application()
+
+# Compile templates now so a freshly (re)spawned worker doesn't pay for it
+# on its first requests.
+from home.startup import warm_templates  # noqa: E402
+
+warm_templates()